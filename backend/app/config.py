@@ -1,6 +1,5 @@
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
-from functools import lru_cache
 from typing import List
 import json
 
@@ -11,6 +10,10 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "JARVIS AI Assistant"
     VERSION: str = "1.0.0"
+    DEBUG: bool = False
+    RELOAD: bool = False  # Auto-reload on code changes (development only)
+    WORKERS: int = 1
+    ENABLE_DOCS: bool = True  # Set to False to skip OpenAPI/docs routes
 
     # Pinecone Settings
     PINECONE_API_KEY: str = ""
@@ -19,8 +22,25 @@ class Settings(BaseSettings):
 
     # LLM Settings
     LLM_MODEL_NAME: str = "llama2"
+    MOCK_DELAY_MS: int = 0  # Simulated latency for mock LLM responses
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     MAX_CONTEXT_LENGTH: int = 3
+    EMBEDDING_BACKEND: str = "torch"  # "torch" or "onnx" (needs optimum[onnxruntime])
+    # ONNX file inside the model repo, e.g. "onnx/model_qint8_avx512_vnni.onnx"
+    EMBEDDING_ONNX_FILE: str = ""
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_THREADS: int = 0  # torch CPU threads; 0 keeps torch's default
+    EMBEDDING_DTYPE: str = "float32"  # "float32" or "int8" (in-memory store)
+    # Upload chunking, in whitespace words. Keep chunks under the embedding
+    # model's max_seq_length (256 wordpieces for all-MiniLM-L6-v2, roughly
+    # 1.3 wordpieces per word) or their tails are truncated away
+    CHUNK_WORDS: int = 180
+    CHUNK_OVERLAP_WORDS: int = 30
+    USE_ANN: bool = False  # HNSW index for in-memory search (requires hnswlib)
+    # In-memory store snapshot; "" disables. Single-process only: every
+    # worker keeps its own store, so with `uvicorn --workers N` (which this
+    # setting cannot see, unlike WORKERS) set it to "" or use Pinecone
+    PERSIST_PATH: str = "./.jarvis_store"
 
     # CORS Settings
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -46,9 +66,4 @@ class Settings(BaseSettings):
     }
 
 
-@lru_cache()
-def get_settings() -> Settings:
-    return Settings()
-
-
-settings = get_settings()
+settings = Settings()
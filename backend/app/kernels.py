@@ -0,0 +1,89 @@
+# app/kernels.py
+#
+# Optional Numba kernels for the in-memory vector store. Importing this
+# module raises ImportError when numba is not installed; callers fall back
+# to the NumPy path.
+
+from typing import Tuple
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+# Below this many rows the thread fork/join costs more than the scan
+PARALLEL_MIN_ROWS = 4096
+
+
+def search_topk(
+    matrix: np.ndarray, q: np.ndarray, threshold: float, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fused dot-product, threshold and top-k over the rows of ``matrix``
+
+    Small matrices are scanned on the calling thread. Larger ones are split
+    into one block per thread; each block keeps its own best ``k`` (sorted,
+    descending) and the per-block winners are merged at the end.
+
+    Returns:
+        (row indices, scores), best first, at most ``k`` long
+    """
+    n = matrix.shape[0]
+    if n < PARALLEL_MIN_ROWS:
+        return _search_topk_serial(matrix, q, threshold, k)
+    return _search_topk(matrix, q, threshold, k, min(n, get_num_threads()))
+
+
+@njit(fastmath=True, cache=True)
+def _scan_block(matrix, q, threshold, start, stop, best_scores, best_rows):
+    k = best_scores.shape[0]
+    d = matrix.shape[1]
+    for i in range(start, stop):
+        # float32 accumulator so the loop vectorizes to packed FMAs
+        score = np.float32(0.0)
+        for j in range(d):
+            score += matrix[i, j] * q[j]
+        if score < threshold or score <= best_scores[k - 1]:
+            continue
+
+        # Insertion into the block's sorted top-k
+        pos = k - 1
+        while pos > 0 and best_scores[pos - 1] < score:
+            best_scores[pos] = best_scores[pos - 1]
+            best_rows[pos] = best_rows[pos - 1]
+            pos -= 1
+        best_scores[pos] = score
+        best_rows[pos] = i
+
+
+@njit(fastmath=True, cache=True)
+def _search_topk_serial(matrix, q, threshold, k):
+    best_scores = np.full(k, -np.inf)
+    best_rows = np.full(k, -1, dtype=np.int64)
+    _scan_block(matrix, q, threshold, 0, matrix.shape[0], best_scores, best_rows)
+    found = best_rows >= 0
+    return best_rows[found], best_scores[found]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _search_topk(matrix, q, threshold, k, blocks):
+    n = matrix.shape[0]
+    best_scores = np.full((blocks, k), -np.inf)
+    best_rows = np.full((blocks, k), -1, dtype=np.int64)
+
+    for b in prange(blocks):
+        _scan_block(
+            matrix,
+            q,
+            threshold,
+            b * n // blocks,
+            (b + 1) * n // blocks,
+            best_scores[b],
+            best_rows[b],
+        )
+
+    scores = best_scores.ravel()
+    rows = best_rows.ravel()
+    order = np.argsort(-scores)[:k]
+    rows = rows[order]
+    scores = scores[order]
+    found = rows >= 0
+    return rows[found], scores[found]
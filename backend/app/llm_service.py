@@ -1,7 +1,17 @@
 import asyncio
+import logging
+import re
+from functools import lru_cache
 from typing import List, Optional
 from .config import settings
 
+logger = logging.getLogger("jarvis.llm_service")
+
+# Mock prompt classifiers
+_IDENTITY_RE = re.compile(r"who are you|what are you|introduce yourself", re.I)
+_CAPS_RE = re.compile(r"what can you do|capabilities|features|help", re.I)
+_QWORD_RE = re.compile(r"^(?:how|why|what|when|where) ", re.I)
+
 class LLMService:
     """Service for LLM interactions"""
     
@@ -15,7 +25,7 @@ class LLMService:
         # self.client = ollama.Client()
         # self.mock_mode = False
         
-        print(f"LLM Service initialized (mock_mode={self.mock_mode})")
+        logger.info("LLM Service initialized (mock_mode=%s)", self.mock_mode)
     
     async def generate_response(
         self,
@@ -41,10 +51,9 @@ class LLMService:
     
     async def _mock_generate(self, prompt: str, context: Optional[List[str]]) -> str:
         """Mock LLM responses for development"""
-        # Simulate API delay
-        await asyncio.sleep(1.0)
-        
-        prompt_lower = prompt.lower()
+        # Optionally simulate API delay
+        if settings.MOCK_DELAY_MS:
+            await asyncio.sleep(settings.MOCK_DELAY_MS / 1000)
         
         # Contextual responses
         if context and len(context) > 0:
@@ -57,7 +66,7 @@ class LLMService:
             )
         
         # Identity questions
-        if any(word in prompt_lower for word in ["who are you", "what are you", "introduce yourself"]):
+        if _IDENTITY_RE.search(prompt):
             return (
                 "I'm JARVIS, your personal AI assistant! I'm powered by a self-hosted large language model "
                 "and use a vector database for intelligent knowledge retrieval. I can help you store, "
@@ -67,7 +76,7 @@ class LLMService:
             )
         
         # Capability questions
-        if any(word in prompt_lower for word in ["what can you do", "capabilities", "features", "help"]):
+        if _CAPS_RE.search(prompt):
             return (
                 "I can help you with several things:\n\n"
                 "1. 💬 Answer questions using RAG (Retrieval-Augmented Generation)\n"
@@ -80,7 +89,7 @@ class LLMService:
             )
         
         # How/why questions
-        if prompt_lower.startswith(("how ", "why ", "what ", "when ", "where ")):
+        if _QWORD_RE.match(prompt):
             return (
                 f"That's a great question about '{prompt}'. To provide you with the most accurate answer, "
                 f"I recommend adding relevant information to my knowledge base through the Knowledge tab. "
@@ -141,5 +150,7 @@ class LLMService:
         # Placeholder for now
         return "Real LLM integration - Ollama not configured yet"
 
-# Global instance
-llm_service = LLMService()
\ No newline at end of file
+# Shared instance (created on first use)
+@lru_cache()
+def get_llm_service() -> LLMService:
+    return LLMService()
@@ -1,9 +1,15 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, status
-from app.vector_store import vector_store
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime
-import traceback
+from functools import partial
+import codecs
+from typing import List
+import logging
+import re
+
+import anyio
 
 from .config import settings
 from .models import (
@@ -15,14 +21,87 @@ from .models import (
     DeleteResponse,
     HealthResponse
 )
-from .vector_store import vector_store
-from .llm_service import llm_service
+
+logger = logging.getLogger("jarvis")
+
+def setup_logging():
+    """Attach a stream handler to the app logger (DEBUG level when settings.DEBUG)"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(levelname)s: %(name)s - %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+
+# Configured at import so it also applies to reload/worker subprocesses
+setup_logging()
+
+# Heavy services are imported lazily so startup and /health stay fast
+def _vs():
+    """Vector store dependency"""
+    from .vector_store import get_vector_store
+    return get_vector_store()
+
+def _llm():
+    """LLM service dependency"""
+    from .llm_service import get_llm_service
+    return get_llm_service()
+
+# Upload read size in bytes
+UPLOAD_READ_SIZE = 64 * 1024
+
+# Sentence ends or blank lines
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+def _chunk(
+    text: str,
+    size: int = settings.CHUNK_WORDS,
+    overlap: int = settings.CHUNK_OVERLAP_WORDS
+) -> List[str]:
+    """
+    Split text into overlapping windows for embedding
+    
+    Packs whole sentences into chunks of at most `size` whitespace-delimited
+    tokens, carrying the last `overlap` tokens into the next chunk.
+    Sentences longer than `size` are split hard.
+    """
+    size = max(size, 1)
+    overlap = min(max(overlap, 0), size - 1)
+    chunks: List[str] = []
+    current: List[str] = []
+    
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        words = sentence.split()
+        if current and len(current) + len(words) > size:
+            chunks.append(" ".join(current))
+            current = current[-overlap:] if overlap else []
+        current.extend(words)
+        
+        while len(current) > size:
+            chunks.append(" ".join(current[:size]))
+            current = current[size - overlap:]
+    
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Persist the in-memory store on shutdown (and on --reload restarts)
+    from .vector_store import flush_vector_store
+    await anyio.to_thread.run_sync(flush_vector_store)
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="Personal AI Assistant with LLM and Vector Database"
+    description="Personal AI Assistant with LLM and Vector Database",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+    docs_url="/docs" if settings.ENABLE_DOCS else None,
+    redoc_url="/redoc" if settings.ENABLE_DOCS else None,
+    openapi_url="/openapi.json" if settings.ENABLE_DOCS else None
 )
 
 # Configure CORS
@@ -53,7 +132,11 @@ async def health_check():
     )
 
 @app.post(f"{settings.API_V1_STR}/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    vector_store=Depends(_vs),
+    llm_service=Depends(_llm)
+):
     """
     Chat endpoint with RAG (Retrieval-Augmented Generation)
     
@@ -61,19 +144,20 @@ async def chat(request: ChatRequest):
     and generates response using LLM
     """
     try:
-        print(f"\n{'='*50}")
-        print(f"Chat Request: {request.message[:100]}...")
+        logger.debug("Chat request: %.100s", request.message)
         
         # Retrieve relevant context from vector store
-        context_results = vector_store.search(
+        # Embedding + scoring is CPU-bound; keep it off the event loop
+        context_results = await anyio.to_thread.run_sync(partial(
+            vector_store.search,
             request.message,
             top_k=settings.MAX_CONTEXT_LENGTH
-        )
+        ))
         
         # Extract text from results
         context = [result["text"] for result in context_results]
         
-        print(f"Retrieved {len(context)} context sources")
+        logger.debug("Retrieved %d context sources", len(context))
         
         # Generate response using LLM
         response_text = await llm_service.generate_response(
@@ -82,25 +166,28 @@ async def chat(request: ChatRequest):
             conversation_history=request.conversation_history
         )
         
-        print(f"Generated response: {response_text[:100]}...")
-        print(f"{'='*50}\n")
+        logger.debug("Generated response: %.100s", response_text)
         
-        return ChatResponse(
-            response=response_text,
-            sources=context,
-            timestamp=datetime.now()
-        )
+        # Returned as a response object to skip re-validating against
+        # ChatResponse, which is kept as the documented schema
+        return ORJSONResponse({
+            "response": response_text,
+            "sources": context,
+            "timestamp": datetime.now()
+        })
         
     except Exception as e:
-        print(f"Error in chat endpoint: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error in chat endpoint")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating response: {str(e)}"
         )
 
 @app.post(f"{settings.API_V1_STR}/knowledge", response_model=KnowledgeResponse)
-async def add_knowledge(entry: KnowledgeEntry):
+async def add_knowledge(
+    entry: KnowledgeEntry,
+    vector_store=Depends(_vs)
+):
     """
     Add knowledge entry to vector store
     
@@ -108,15 +195,16 @@ async def add_knowledge(entry: KnowledgeEntry):
     and stores in vector database
     """
     try:
-        print(f"\nAdding knowledge: {entry.text[:100]}...")
+        logger.debug("Adding knowledge: %.100s", entry.text)
         
         # Add to vector store
-        entry_id = vector_store.add_knowledge(
+        entry_id = await anyio.to_thread.run_sync(partial(
+            vector_store.add_knowledge,
             text=entry.text,
             metadata=entry.metadata
-        )
+        ))
         
-        print(f"Knowledge added with ID: {entry_id}")
+        logger.debug("Knowledge added with ID: %s", entry_id)
         
         return KnowledgeResponse(
             id=entry_id,
@@ -126,22 +214,21 @@ async def add_knowledge(entry: KnowledgeEntry):
         )
         
     except Exception as e:
-        print(f"Error adding knowledge: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error adding knowledge")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error adding knowledge: {str(e)}"
         )
 
 @app.get(f"{settings.API_V1_STR}/knowledge", response_model=KnowledgeListResponse)
-async def list_knowledge():
+async def list_knowledge(vector_store=Depends(_vs)):
     """
     List all knowledge entries
     
     Returns all entries in the vector store (without embeddings)
     """
     try:
-        knowledge_list = vector_store.list_all()
+        knowledge_list = await anyio.to_thread.run_sync(vector_store.list_all)
         
         return KnowledgeListResponse(
             knowledge=knowledge_list,
@@ -149,22 +236,24 @@ async def list_knowledge():
         )
         
     except Exception as e:
-        print(f"Error listing knowledge: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error listing knowledge")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving knowledge: {str(e)}"
         )
 
 @app.delete(f"{settings.API_V1_STR}/knowledge/{{entry_id}}", response_model=DeleteResponse)
-async def delete_knowledge(entry_id: str):
+async def delete_knowledge(
+    entry_id: str,
+    vector_store=Depends(_vs)
+):
     """
     Delete a knowledge entry by ID
     """
     try:
-        print(f"\nDeleting knowledge entry: {entry_id}")
+        logger.debug("Deleting knowledge entry: %s", entry_id)
         
-        success = vector_store.delete(entry_id)
+        success = await anyio.to_thread.run_sync(vector_store.delete, entry_id)
         
         if not success:
             raise HTTPException(
@@ -181,67 +270,83 @@ async def delete_knowledge(entry_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error deleting knowledge: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error deleting knowledge")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting knowledge: {str(e)}"
         )
 
 @app.post(f"{settings.API_V1_STR}/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    file: UploadFile = File(...),
+    vector_store=Depends(_vs)
+):
     """
     Upload and process document
     
     Accepts text files, extracts content, and adds to knowledge base
     """
     try:
-        print(f"\nUploading file: {file.filename}")
-        
-        # Read file content
-        content = await file.read()
+        logger.debug("Uploading file: %s", file.filename)
         
-        # Decode content (assuming text file)
+        # Read and decode incrementally (assuming text file) so the raw
+        # bytes are never held in memory all at once
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='strict')
+        parts = []
+        size = 0
         try:
-            text = content.decode('utf-8')
+            while block := await file.read(UPLOAD_READ_SIZE):
+                size += len(block)
+                parts.append(decoder.decode(block))
+            parts.append(decoder.decode(b'', final=True))
         except UnicodeDecodeError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="File must be a text file (UTF-8 encoded)"
             )
         
-        # Add to vector store with file metadata
-        entry_id = vector_store.add_knowledge(
-            text=text,
+        # Split into embedding-sized windows and add them in one batch
+        chunks = _chunk(''.join(parts))
+        del parts
+        if not chunks:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+        
+        entry_ids = await anyio.to_thread.run_sync(partial(
+            vector_store.add_knowledge_bulk,
+            chunks,
             metadata={
                 "filename": file.filename,
                 "content_type": file.content_type,
-                "size": len(content)
+                "size": size
             }
-        )
+        ))
         
-        print(f"File processed and added with ID: {entry_id}")
+        logger.debug("File processed into %d chunk(s)", len(entry_ids))
         
         return {
             "success": True,
-            "id": entry_id,
+            "id": entry_ids[0],
+            "ids": entry_ids,
+            "chunks": len(entry_ids),
             "filename": file.filename,
-            "size": len(content),
+            "size": size,
             "message": "File processed and added to knowledge base successfully"
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error processing file: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error processing file")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing file: {str(e)}"
         )
 
 @app.get(f"{settings.API_V1_STR}/stats")
-async def get_stats():
+async def get_stats(vector_store=Depends(_vs)):
     """Get statistics about the vector store"""
     try:
         stats = vector_store.get_stats()
@@ -249,10 +354,10 @@ async def get_stats():
             "vector_store": stats,
             "llm_model": settings.LLM_MODEL_NAME,
             "embedding_model": settings.EMBEDDING_MODEL,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
     except Exception as e:
-        print(f"Error getting stats: {str(e)}")
+        logger.error("Error getting stats: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving statistics: {str(e)}"
@@ -262,26 +367,25 @@ async def get_stats():
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    print(f"Unhandled exception: {str(exc)}")
-    traceback.print_exc()
-    return JSONResponse(
+    logger.error("Unhandled exception: %s", exc, exc_info=exc)
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An unexpected error occurred"}
     )
 @app.get("/vector-stats", tags=["Debug"])
-def vector_stats():
+def vector_stats(vector_store=Depends(_vs)):
     return vector_store.get_stats()
 
 if __name__ == "__main__":
     import uvicorn # type: ignore
-    print(f"\n{'='*60}")
-    print(f"Starting {settings.PROJECT_NAME}")
-    print(f"Version: {settings.VERSION}")
-    print(f"{'='*60}\n")
+    logger.info("Starting %s (version %s)", settings.PROJECT_NAME, settings.VERSION)
+    # loop/http "auto" pick uvloop and httptools when they are installed
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
-        
+        loop="auto",
+        http="auto",
+        reload=settings.RELOAD,
+        workers=settings.WORKERS
     )
\ No newline at end of file
@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 class ChatMessage(BaseModel):
     """Single chat message"""
+    model_config = ConfigDict(defer_build=True)
+
     role: str = Field(..., description="Role: 'user' or 'assistant'")
     content: str = Field(..., description="Message content")
     timestamp: Optional[datetime] = Field(default_factory=datetime.now)
@@ -18,6 +20,8 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     """Response from chat endpoint"""
+    model_config = ConfigDict(defer_build=True)
+
     response: str = Field(..., description="Assistant response")
     sources: List[str] = Field(
         default=[],
@@ -35,6 +39,8 @@ class KnowledgeEntry(BaseModel):
 
 class KnowledgeResponse(BaseModel):
     """Response from adding knowledge"""
+    model_config = ConfigDict(defer_build=True)
+
     id: str = Field(..., description="Unique knowledge entry ID")
     text: str = Field(..., description="The knowledge text")
     timestamp: datetime = Field(default_factory=datetime.now)
@@ -42,6 +48,8 @@ class KnowledgeResponse(BaseModel):
 
 class KnowledgeListResponse(BaseModel):
     """List of all knowledge entries"""
+    model_config = ConfigDict(defer_build=True)
+
     knowledge: List[Dict[str, Any]] = Field(
         default=[],
         description="List of knowledge entries"
@@ -50,12 +58,16 @@ class KnowledgeListResponse(BaseModel):
 
 class DeleteResponse(BaseModel):
     """Response from delete operation"""
+    model_config = ConfigDict(defer_build=True)
+
     success: bool = Field(..., description="Success status")
     id: str = Field(..., description="Deleted entry ID")
     message: str = Field(default="Entry deleted successfully")
 
 class HealthResponse(BaseModel):
     """Health check response"""
+    model_config = ConfigDict(defer_build=True)
+
     status: str = Field(default="healthy")
     version: str = Field(...)
     timestamp: datetime = Field(default_factory=datetime.now)
\ No newline at end of file
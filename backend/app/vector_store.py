@@ -1,29 +1,110 @@
 # app/vector_store.py
 
+import logging
+import os
+import threading
+import time
 import uuid
-from datetime import datetime
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import orjson
 
 from .config import settings
 
+logger = logging.getLogger("jarvis.vector_store")
+
+INT8_SCALE = 127
+INITIAL_CAPACITY = 1024
+
+# Matrix rows are zero-padded to a whole number of cache lines and the
+# buffer starts on one, so row loads never split a line
+CACHE_LINE = 64
+
+# Rows upcast to int32 at a time when scoring int8 storage
+INT8_BLOCK_ROWS = 8192
+
+# Vectors per Pinecone upsert request (each carries its text as metadata)
+PINECONE_UPSERT_BATCH = 100
+
+# HNSW parameters for the optional ANN index (settings.USE_ANN)
+ANN_M = 16
+ANN_EF_CONSTRUCTION = 200
+ANN_EF = 64
+# Exact search is fast enough (and exact) below this many rows
+ANN_MIN_ROWS = 10_000
+
+# Files written under settings.PERSIST_PATH
+EMBEDDINGS_FILE = "emb.npy"
+SCALES_FILE = "scales.npy"
+TIMESTAMPS_FILE = "timestamps.npy"
+COLUMN_FILES = ("ids.json", "texts.json", "metas.json")
+# ISO-string timestamps written by older versions
+LEGACY_TIMESTAMPS_FILE = "timestamps.json"
+# Model, dimension and row count; written last so it marks a complete flush
+MANIFEST_FILE = "store.json"
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Recently embedded texts (LRU); shared by all store instances
+EMBEDDING_CACHE_SIZE = 4096
+EMBEDDING_CACHE_MAX_TEXT = 10_000  # longer texts bypass the cache
+_EMB_CACHE: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_EMB_CACHE_LOCK = threading.Lock()
+
 
 class VectorStore:
     """Vector database for storing and retrieving knowledge"""
 
     def __init__(self):
-        print(f"Loading embedding model: {settings.EMBEDDING_MODEL}")
-        self.embedder = SentenceTransformer(settings.EMBEDDING_MODEL)
+        # Loaded on first encode; see the ``embedder`` property
+        self._embedder = None
+        self._embedder_lock = threading.Lock()
 
         self.use_pinecone = bool(settings.PINECONE_API_KEY)
 
         if self.use_pinecone:
             self._init_pinecone()
         else:
-            self.memory_store: List[Dict] = []
-            print("Vector store initialized (in-memory mode)")
+            # Column-oriented store: one L2-normalized float32 row per
+            # entry in ``_embeddings`` plus parallel Python columns.
+            # Allocated on first insert, once the dimension is known
+            self._embeddings: Optional[np.ndarray] = None
+            # Per-row dequantization scales (int8 storage only)
+            self._scales: Optional[np.ndarray] = None
+            # Insertion times as int64 epoch nanoseconds (UTC)
+            self._timestamps: Optional[np.ndarray] = None
+            self._capacity = 0
+            self._n = 0
+            self._dim = 0
+            self._ids: List[str] = []
+            self._texts: List[str] = []
+            self._metas: List[Dict] = []
+            self._id_to_row: Dict[str, int] = {}
+            # list_all() result, dropped on every insert/delete
+            self._list_cache: Optional[List[Dict]] = None
+            # Optional hnswlib index labelled by row, built in the
+            # background once the store reaches ANN_MIN_ROWS
+            self._ann = None
+            # Rows written while that build runs (None when not building)
+            self._ann_dirty: Optional[set] = None
+            self._ann_failed = False
+            # Endpoints call into the store from worker threads
+            self._lock = threading.Lock()
+            if settings.PERSIST_PATH:
+                if settings.WORKERS > 1:
+                    # Every worker holds its own copy of the store; letting
+                    # each flush to the same path would keep only the last
+                    logger.warning(
+                        "WORKERS=%d: %s is loaded but never flushed",
+                        settings.WORKERS,
+                        settings.PERSIST_PATH,
+                    )
+                self._load(settings.PERSIST_PATH)
+            logger.info("Vector store initialized (in-memory mode)")
 
     # ------------------------------------------------------------------
     # Initialization
@@ -32,21 +113,147 @@ class VectorStore:
     def _init_pinecone(self):
         from pinecone import Pinecone
 
-        print("Initializing Pinecone vector store...")
+        logger.info("Initializing Pinecone vector store...")
         pc = Pinecone(api_key=settings.PINECONE_API_KEY)
         self.index = pc.Index(settings.PINECONE_INDEX_NAME)
 
-        print(
-            f"Pinecone index connected: {settings.PINECONE_INDEX_NAME}"
+        logger.info(
+            "Pinecone index connected: %s", settings.PINECONE_INDEX_NAME
         )
 
+    def _maybe_build_ann(self) -> None:
+        # Called with self._lock held
+        if (
+            not settings.USE_ANN
+            or self._ann is not None
+            or self._ann_dirty is not None
+            or self._ann_failed
+            or self._n < ANN_MIN_ROWS
+            or _load_hnswlib() is None
+        ):
+            return
+
+        # Building takes seconds at this size, so it runs off the lock on a
+        # copy of the rows; exact search serves queries meanwhile
+        self._ann_dirty = set()
+        rows = np.array(self._float_rows(0, self._n), dtype=np.float32)
+        threading.Thread(
+            target=self._build_ann,
+            args=(rows, self._capacity),
+            name="jarvis-ann-build",
+            daemon=True,
+        ).start()
+
+    def _build_ann(self, rows: np.ndarray, capacity: int) -> None:
+        hnswlib = _load_hnswlib()
+        n = len(rows)
+        logger.info("Building HNSW index over %d entries", n)
+        try:
+            ann = hnswlib.Index(space="cosine", dim=self._dim)
+            ann.init_index(
+                max_elements=capacity,
+                ef_construction=ANN_EF_CONSTRUCTION,
+                M=ANN_M,
+            )
+            ann.set_ef(ANN_EF)
+            ann.add_items(rows, np.arange(n))
+
+            with self._lock:
+                # Replay the rows inserted or moved by deletes since the copy
+                if ann.get_max_elements() < self._capacity:
+                    ann.resize_index(self._capacity)
+                for row in sorted(self._ann_dirty):
+                    if row < self._n:
+                        ann.add_items(self._row_vector(row)[None, :], [row])
+                    elif row < n:
+                        ann.mark_deleted(row)
+                self._ann = ann
+                self._ann_dirty = None
+        except Exception:
+            logger.exception(
+                "Building the HNSW index failed; using exact search"
+            )
+            with self._lock:
+                self._ann_dirty = None
+                self._ann_failed = True
+            return
+
+        logger.info("HNSW index ready")
+
     # ------------------------------------------------------------------
     # Embeddings
     # ------------------------------------------------------------------
 
-    def generate_embedding(self, text: str) -> List[float]:
-        embedding = self.embedder.encode(text, convert_to_tensor=False)
-        return embedding.tolist()
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            # Requests can arrive together on different worker threads;
+            # load the model only once
+            with self._embedder_lock:
+                if self._embedder is None:
+                    self._embedder = self._load_embedder()
+        return self._embedder
+
+    def _load_embedder(self):
+        from sentence_transformers import SentenceTransformer
+
+        logger.info("Loading embedding model: %s", settings.EMBEDDING_MODEL)
+        if settings.EMBEDDING_BACKEND == "onnx":
+            model_kwargs = (
+                {"file_name": settings.EMBEDDING_ONNX_FILE}
+                if settings.EMBEDDING_ONNX_FILE
+                else None
+            )
+            try:
+                return SentenceTransformer(
+                    settings.EMBEDDING_MODEL,
+                    backend="onnx",
+                    model_kwargs=model_kwargs,
+                )
+            except Exception as e:
+                # optimum/onnxruntime missing or no usable ONNX export
+                logger.warning(
+                    "ONNX backend unavailable (%s); using torch", e
+                )
+
+        if settings.EMBEDDING_THREADS:
+            import torch
+
+            torch.set_num_threads(settings.EMBEDDING_THREADS)
+
+        # SentenceTransformer picks CUDA/MPS automatically when present
+        return SentenceTransformer(settings.EMBEDDING_MODEL)
+
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Encode texts to L2-normalized float32 rows"""
+        embeddings = self.embedder.encode(
+            texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+    def generate_embedding(self, text: str) -> np.ndarray:
+        if len(text) > EMBEDDING_CACHE_MAX_TEXT:
+            return self.generate_embeddings([text])[0]
+
+        with _EMB_CACHE_LOCK:
+            cached = _EMB_CACHE.get(text)
+            if cached is not None:
+                _EMB_CACHE.move_to_end(text)
+                return cached
+
+        embedding = self.generate_embeddings([text])[0]
+        # Cached arrays are shared between callers
+        embedding.setflags(write=False)
+
+        with _EMB_CACHE_LOCK:
+            _EMB_CACHE[text] = embedding
+            if len(_EMB_CACHE) > EMBEDDING_CACHE_SIZE:
+                _EMB_CACHE.popitem(last=False)
+        return embedding
 
     # ------------------------------------------------------------------
     # Add
@@ -60,7 +267,7 @@ class VectorStore:
             "id": entry_id,
             "text": text,
             "metadata": metadata or {},
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": time.time_ns(),
         }
 
         if self.use_pinecone:
@@ -68,22 +275,84 @@ class VectorStore:
                 vectors=[
                     (
                         entry_id,
-                        embedding,
+                        embedding.tolist(),
                         {
                             "text": text,
                             **record["metadata"],
-                            "timestamp": record["timestamp"],
+                            "timestamp": _format_timestamp(record["timestamp"]),
                         },
                     )
                 ]
             )
         else:
-            record["embedding"] = embedding
-            self.memory_store.append(record)
+            with self._lock:
+                self._append(record, embedding)
 
-        print(f"Added knowledge entry: {entry_id}")
+        logger.debug("Added knowledge entry: %s", entry_id)
         return entry_id
 
+    def add_knowledge_bulk(
+        self, texts: List[str], metadata: Optional[Dict] = None
+    ) -> List[str]:
+        """Add chunks of one document, sharing metadata plus a chunk index"""
+        return self.add_knowledge_batch(
+            texts,
+            [{**(metadata or {}), "chunk": i} for i in range(len(texts))],
+        )
+
+    def add_knowledge_batch(
+        self, texts: List[str], metadatas: Optional[List[Dict]] = None
+    ) -> List[str]:
+        """Add many entries with one encode call and one upsert"""
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError(
+                f"Got {len(metadatas)} metadata dicts for {len(texts)} texts"
+            )
+        if not texts:
+            return []
+
+        embeddings = self.generate_embeddings(texts)
+        timestamp = time.time_ns()
+        entry_ids = [str(uuid.uuid4()) for _ in texts]
+
+        records = [
+            {
+                "id": entry_id,
+                "text": text,
+                "metadata": metadata or {},
+                "timestamp": timestamp,
+            }
+            for entry_id, text, metadata in zip(
+                entry_ids, texts, metadatas or [None] * len(texts)
+            )
+        ]
+
+        if self.use_pinecone:
+            vectors = [
+                (
+                    record["id"],
+                    embedding.tolist(),
+                    {
+                        "text": record["text"],
+                        **record["metadata"],
+                        "timestamp": _format_timestamp(record["timestamp"]),
+                    },
+                )
+                for record, embedding in zip(records, embeddings)
+            ]
+            # Stay under Pinecone's per-request size and record limits
+            for start in range(0, len(vectors), PINECONE_UPSERT_BATCH):
+                self.index.upsert(
+                    vectors=vectors[start:start + PINECONE_UPSERT_BATCH]
+                )
+        else:
+            with self._lock:
+                for record, embedding in zip(records, embeddings):
+                    self._append(record, embedding)
+
+        logger.debug("Added %d knowledge entries", len(entry_ids))
+        return entry_ids
+
     # ------------------------------------------------------------------
     # Search
     # ------------------------------------------------------------------
@@ -98,7 +367,7 @@ class VectorStore:
 
         if self.use_pinecone:
             results = self.index.query(
-                vector=query_embedding,
+                vector=query_embedding.tolist(),
                 top_k=top_k,
                 include_metadata=True,
             )
@@ -120,24 +389,77 @@ class VectorStore:
 
         # ---------------- In-memory fallback ----------------
 
-        scored = []
-        for entry in self.memory_store:
-            score = self._cosine_similarity(
-                query_embedding, entry["embedding"]
-            )
-            if score >= threshold:
-                scored.append(
-                    {
-                        "id": entry["id"],
-                        "text": entry["text"],
-                        "score": score,
-                        "metadata": entry["metadata"],
-                        "timestamp": entry["timestamp"],
-                    }
+        # generate_embedding returns unit vectors, so scores are plain dots
+        with self._lock:
+            return self._search_memory(query_embedding, top_k, threshold)
+
+    def _search_memory(
+        self, q: np.ndarray, top_k: int, threshold: float
+    ) -> List[Dict]:
+        n = self._n
+        if n == 0 or top_k <= 0:
+            return []
+
+        if self._ann is not None:
+            k = min(top_k, n)
+            # hnswlib needs ef >= k for the search to return k results
+            if k > self._ann.ef:
+                self._ann.set_ef(k)
+            labels, distances = self._ann.knn_query(q, k=k)
+            # Cosine distance is 1 - similarity
+            return self._results(labels[0], 1.0 - distances[0], threshold)
+
+        matrix = self.matrix_view
+        if matrix.shape[1] != q.shape[0]:
+            # Padding columns are zero, so they add nothing to the dots
+            pad = np.zeros(matrix.shape[1] - q.shape[0], dtype=q.dtype)
+            q = np.concatenate((q, pad))
+        if matrix.dtype == np.float32:
+            # Fused Numba kernel when installed; it scans small stores on
+            # this thread and splits large ones across threads
+            search_topk = _load_topk_kernel()
+            if search_topk is not None:
+                rows, scores = search_topk(
+                    np.asarray(matrix), q, threshold, min(top_k, n)
                 )
+                return self._results(rows, scores, threshold)
+
+        if matrix.dtype == np.int8:
+            # Accumulate in int32, a block of rows at a time so the upcast
+            # copy stays small, then undo both quantization scales
+            q8, q_scale = self._quantize(q)
+            q32 = q8.astype(np.int32)
+            scores = np.empty(n, dtype=np.float32)
+            for start in range(0, n, INT8_BLOCK_ROWS):
+                block = matrix[start:start + INT8_BLOCK_ROWS]
+                scores[start:start + len(block)] = block.astype(np.int32) @ q32
+            scores *= self._scales[:n] * q_scale
+        else:
+            scores = matrix @ q
 
-        scored.sort(key=lambda x: x["score"], reverse=True)
-        return scored[:top_k]
+        # Partition only the rows that pass the threshold, then sort the
+        # surviving top_k
+        top = np.flatnonzero(scores >= threshold)
+        if len(top) > top_k:
+            top = top[np.argpartition(-scores[top], top_k - 1)[:top_k]]
+        top = top[np.argsort(-scores[top])]
+
+        return self._results(top, scores[top], threshold)
+
+    def _results(
+        self, rows: np.ndarray, scores: np.ndarray, threshold: float
+    ) -> List[Dict]:
+        return [
+            {
+                "id": self._ids[i],
+                "text": self._texts[i],
+                "score": float(score),
+                "metadata": self._metas[i],
+                "timestamp": _format_timestamp(self._timestamps[i]),
+            }
+            for i, score in zip(rows, scores)
+            if score >= threshold
+        ]
 
     # ------------------------------------------------------------------
     # Delete
@@ -146,18 +468,38 @@ class VectorStore:
     def delete(self, entry_id: str) -> bool:
         if self.use_pinecone:
             self.index.delete(ids=[entry_id])
-            print(f"Deleted Pinecone entry: {entry_id}")
+            logger.debug("Deleted Pinecone entry: %s", entry_id)
             return True
 
-        initial = len(self.memory_store)
-        self.memory_store = [
-            e for e in self.memory_store if e["id"] != entry_id
-        ]
-        deleted = len(self.memory_store) < initial
-
-        if deleted:
-            print(f"Deleted in-memory entry: {entry_id}")
-        return deleted
+        with self._lock:
+            row = self._id_to_row.pop(entry_id, None)
+            if row is None:
+                return False
+
+            # Move the last entry into the freed row
+            last = self._n - 1
+            columns = (self._ids, self._texts, self._metas)
+            if row != last:
+                self._embeddings[row] = self._embeddings[last]
+                self._timestamps[row] = self._timestamps[last]
+                if self._scales is not None:
+                    self._scales[row] = self._scales[last]
+                for column in columns:
+                    column[row] = column[last]
+                self._id_to_row[self._ids[row]] = row
+                if self._ann is not None:
+                    self._ann.add_items(self._row_vector(row)[None, :], [row])
+            for column in columns:
+                column.pop()
+            if self._ann is not None:
+                self._ann.mark_deleted(last)
+            if self._ann_dirty is not None:
+                self._ann_dirty.update((row, last))
+            self._n -= 1
+            self._list_cache = None
+
+        logger.debug("Deleted in-memory entry: %s", entry_id)
+        return True
 
     # ------------------------------------------------------------------
     # List
@@ -169,15 +511,25 @@ class VectorStore:
             # This endpoint should be disabled or paginated in prod
             return []
 
-        return [
-            {
-                "id": e["id"],
-                "text": e["text"],
-                "metadata": e["metadata"],
-                "timestamp": e["timestamp"],
-            }
-            for e in self.memory_store
-        ]
+        with self._lock:
+            if self._n == 0:
+                return []
+            if self._list_cache is None:
+                self._list_cache = [
+                    {
+                        "id": entry_id,
+                        "text": text,
+                        "metadata": metadata,
+                        "timestamp": _format_timestamp(timestamp),
+                    }
+                    for entry_id, text, metadata, timestamp in zip(
+                        self._ids,
+                        self._texts,
+                        self._metas,
+                        self._timestamps[:self._n].tolist(),
+                    )
+                ]
+            return self._list_cache
 
     # ------------------------------------------------------------------
     # Stats
@@ -195,30 +547,297 @@ class VectorStore:
 
         return {
             "backend": "memory",
-            "total_entries": len(self.memory_store),
-            "dimension": (
-                len(self.memory_store[0]["embedding"])
-                if self.memory_store
-                else 0
-            ),
+            "total_entries": self._n,
+            "dimension": self._dim,
             "model": settings.EMBEDDING_MODEL,
         }
 
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Write the in-memory store to settings.PERSIST_PATH"""
+        if self.use_pinecone or not settings.PERSIST_PATH or settings.WORKERS > 1:
+            return
+
+        path = settings.PERSIST_PATH
+        with self._lock:
+            if self._embeddings is None:
+                return
+
+            if isinstance(self._embeddings, np.memmap):
+                # Still mapped from emb.npy, which Windows refuses to
+                # replace while a mapping is open; move the rows off it
+                self._embeddings = self._copy_matrix(self._capacity)
+
+            os.makedirs(path, exist_ok=True)
+            self._write_file(
+                path,
+                EMBEDDINGS_FILE,
+                lambda f: np.save(f, self.matrix_view[:, :self._dim]),
+            )
+            if self._scales is not None:
+                self._write_file(
+                    path,
+                    SCALES_FILE,
+                    lambda f: np.save(f, self._scales[:self._n]),
+                )
+            self._write_file(
+                path,
+                TIMESTAMPS_FILE,
+                lambda f: np.save(f, self._timestamps[:self._n]),
+            )
+            columns = (self._ids, self._texts, self._metas)
+            for name, column in zip(COLUMN_FILES, columns):
+                self._write_file(
+                    path, name, lambda f: f.write(orjson.dumps(column))
+                )
+            legacy = os.path.join(path, LEGACY_TIMESTAMPS_FILE)
+            if os.path.exists(legacy):
+                os.remove(legacy)
+            manifest = {
+                "model": settings.EMBEDDING_MODEL,
+                "dim": self._dim,
+                "count": self._n,
+            }
+            self._write_file(
+                path, MANIFEST_FILE, lambda f: f.write(orjson.dumps(manifest))
+            )
+
+        logger.info("Flushed %d entries to %s", self._n, path)
+
+    def _write_file(self, path: str, name: str, write) -> None:
+        # Write to a temp file and swap it in, so a mapped matrix or an
+        # interrupted flush never sees a half-written file
+        target = os.path.join(path, name)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+
+    def _load(self, path: str) -> None:
+        embeddings_path = os.path.join(path, EMBEDDINGS_FILE)
+        if not os.path.exists(embeddings_path):
+            return
+
+        try:
+            # Copy-on-write mapping: rows are paged in on demand and in-place
+            # edits stay private until the next flush()
+            embeddings = np.load(embeddings_path, mmap_mode="c")
+            columns = []
+            for name in COLUMN_FILES:
+                with open(os.path.join(path, name), "rb") as f:
+                    columns.append(orjson.loads(f.read()))
+
+            timestamps_path = os.path.join(path, TIMESTAMPS_FILE)
+            if os.path.exists(timestamps_path):
+                timestamps = np.load(timestamps_path)
+            else:
+                with open(os.path.join(path, LEGACY_TIMESTAMPS_FILE), "rb") as f:
+                    timestamps = np.array(
+                        [_parse_timestamp(ts) for ts in orjson.loads(f.read())],
+                        dtype=np.int64,
+                    )
+
+            # Snapshots from before the manifest was added are taken as is
+            manifest = None
+            manifest_path = os.path.join(path, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                with open(manifest_path, "rb") as f:
+                    manifest = orjson.loads(f.read())
+        except (OSError, ValueError) as e:
+            # e.g. a missing column file after an interrupted first flush
+            logger.warning("Ignoring unreadable vector store at %s: %s", path, e)
+            return
+
+        n = embeddings.shape[0]
+        if len(timestamps) != n or any(len(column) != n for column in columns):
+            logger.warning("Ignoring inconsistent vector store at %s", path)
+            return
+        if manifest is not None and (
+            manifest.get("dim") != embeddings.shape[1]
+            or manifest.get("count") != n
+        ):
+            logger.warning("Ignoring inconsistent vector store at %s", path)
+            return
+        if manifest is not None and manifest.get("model") != settings.EMBEDDING_MODEL:
+            logger.warning(
+                "Ignoring vector store at %s built with %s (EMBEDDING_MODEL is %s)",
+                path,
+                manifest.get("model"),
+                settings.EMBEDDING_MODEL,
+            )
+            return
+        if n == 0:
+            return
+
+        # The stored dtype wins over EMBEDDING_DTYPE for existing data
+        self._embeddings = embeddings
+        if embeddings.dtype == np.int8:
+            scales_path = os.path.join(path, SCALES_FILE)
+            if os.path.exists(scales_path):
+                self._scales = np.load(scales_path)
+            else:
+                # Older int8 snapshots used one fixed scale for every row
+                self._scales = np.full(n, 1.0 / INT8_SCALE, dtype=np.float32)
+        self._capacity = n
+        self._n = n
+        self._dim = embeddings.shape[1]
+        self._timestamps = timestamps
+        self._ids, self._texts, self._metas = columns
+        self._id_to_row = {entry_id: row for row, entry_id in enumerate(self._ids)}
+
+        self._maybe_build_ann()
+
+        logger.info("Loaded %d entries from %s", n, path)
+
     # ------------------------------------------------------------------
     # Utils
     # ------------------------------------------------------------------
 
-    def _cosine_similarity(
-        self, a: List[float], b: List[float]
-    ) -> float:
-        a = np.array(a)
-        b = np.array(b)
-        denom = np.linalg.norm(a) * np.linalg.norm(b)
-        return float(np.dot(a, b) / denom) if denom else 0.0
+    @property
+    def matrix_view(self) -> np.ndarray:
+        """Read-only view of the live (padded) rows of the embedding matrix"""
+        if self._embeddings is None:
+            return np.empty((0, 0), dtype=np.float32)
+        view = self._embeddings[:self._n]
+        view.flags.writeable = False
+        return view
+
+    def _quantize(self, vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        # Symmetric per-vector scale: the largest component maps to +/-127
+        scale = float(np.abs(vector).max()) / INT8_SCALE or 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+
+    def _grow(self) -> None:
+        # Double capacity so appends stay amortized O(1)
+        self._embeddings = self._copy_matrix(2 * self._capacity)
+        if self._scales is not None:
+            scales = np.empty(2 * self._capacity, dtype=np.float32)
+            scales[:self._n] = self._scales[:self._n]
+            self._scales = scales
+        timestamps = np.empty(2 * self._capacity, dtype=np.int64)
+        timestamps[:self._n] = self._timestamps[:self._n]
+        self._timestamps = timestamps
+        self._capacity *= 2
+        if self._ann is not None:
+            self._ann.resize_index(self._capacity)
+
+    def _copy_matrix(self, capacity: int) -> np.ndarray:
+        # A matrix loaded from disk is unpadded; the copy is padded
+        matrix = _aligned_matrix(capacity, self._dim, self._embeddings.dtype)
+        matrix[:self._n, :self._dim] = self._embeddings[:self._n, :self._dim]
+        return matrix
+
+    def _float_rows(self, start: int, stop: int) -> np.ndarray:
+        rows = self._embeddings[start:stop, :self._dim]
+        if rows.dtype == np.int8:
+            return rows.astype(np.float32) * self._scales[start:stop, None]
+        return rows
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        return self._float_rows(row, row + 1)[0]
+
+    def _append(self, record: Dict, vector: np.ndarray) -> None:
+        # ``vector`` is already L2-normalized by generate_embeddings
+
+        if self._embeddings is None:
+            self._capacity = INITIAL_CAPACITY
+            self._dim = vector.shape[0]
+            self._embeddings = _aligned_matrix(
+                self._capacity,
+                self._dim,
+                np.int8 if settings.EMBEDDING_DTYPE == "int8" else np.float32,
+            )
+            if self._embeddings.dtype == np.int8:
+                self._scales = np.empty(self._capacity, dtype=np.float32)
+            self._timestamps = np.empty(self._capacity, dtype=np.int64)
+        elif self._n == self._capacity:
+            self._grow()
+
+        if self._ann is not None:
+            self._ann.add_items(vector[None, :], [self._n])
+        elif self._ann_dirty is not None:
+            self._ann_dirty.add(self._n)
+        if self._scales is not None:
+            vector, self._scales[self._n] = self._quantize(vector)
+
+        self._embeddings[self._n, :self._dim] = vector
+        self._timestamps[self._n] = record["timestamp"]
+        self._ids.append(record["id"])
+        self._texts.append(record["text"])
+        self._metas.append(record["metadata"])
+        self._id_to_row[record["id"]] = self._n
+        self._n += 1
+        self._list_cache = None
+
+        self._maybe_build_ann()
+
+
+def _aligned_matrix(rows: int, dim: int, dtype) -> np.ndarray:
+    """Zeroed (rows, dim) matrix, padded and aligned to CACHE_LINE bytes"""
+    dtype = np.dtype(dtype)
+    per_line = CACHE_LINE // dtype.itemsize
+    width = -(-dim // per_line) * per_line
+    nbytes = rows * width * dtype.itemsize
+    buf = np.zeros(nbytes + CACHE_LINE, dtype=np.uint8)
+    offset = -buf.ctypes.data % CACHE_LINE
+    return buf[offset:offset + nbytes].view(dtype).reshape(rows, width)
+
+
+def _format_timestamp(ns: int) -> str:
+    """ISO-8601 string (naive UTC) for epoch nanoseconds"""
+    return (_EPOCH + timedelta(microseconds=int(ns) // 1000)).isoformat()
+
+
+def _parse_timestamp(value: str) -> int:
+    """Epoch nanoseconds for a naive UTC ISO-8601 string"""
+    micros = (datetime.fromisoformat(value) - _EPOCH) // timedelta(microseconds=1)
+    return micros * 1000
+
+
+@lru_cache()
+def _load_hnswlib():
+    try:
+        import hnswlib
+    except ImportError:
+        logger.warning(
+            "USE_ANN is set but hnswlib is not installed; using exact search"
+        )
+        return None
+    return hnswlib
+
+
+@lru_cache()
+def _load_topk_kernel():
+    try:
+        from .kernels import search_topk
+    except ImportError:
+        return None
+    return search_topk
 
 
 # ----------------------------------------------------------------------
-# Global instance (loaded once)
+# Shared instance (created on first use)
 # ----------------------------------------------------------------------
 
-vector_store = VectorStore()
+_store: Optional[VectorStore] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    global _store
+    # Dependencies run in the threadpool, so the first requests can race
+    # here; only one of them may build the store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = VectorStore()
+    return _store
+
+
+def flush_vector_store() -> None:
+    """Flush the shared store if it has been created"""
+    if _store is not None:
+        _store.flush()